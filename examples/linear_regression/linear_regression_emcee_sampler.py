@@ -32,7 +32,8 @@ import arviz as az
 import matplotlib.pyplot as plt
 from cofi import BaseProblem, InversionOptions, Inversion
 
-np.random.seed(42)
+rng = np.random.default_rng(42)
+np.random.seed(42)      # emcee starts its own generator from NumPy's global state
 
 save_plot = True
 show_plot = False
@@ -49,14 +50,14 @@ def main(output_dir="."):
 
     # generate data with random Gaussian noise
     def basis_func(x):
-        return np.array([x**i for i in range(4)]).T                           # x -> G
+        return np.vander(x, N=4, increasing=True)                             # x -> G
     _m_true = np.array([-6,-5,2,1])                                           # m
 
     sample_size = 20                                                          # N
-    x = np.random.choice(np.linspace(-3.5,2.5), size=sample_size)             # x
+    x = rng.uniform(-3.5, 2.5, size=sample_size)                              # x
     def forward_func(m):
         return basis_func(x) @ m                                              # m -> y_synthetic
-    y_observed = forward_func(_m_true) + np.random.normal(0,1,sample_size)    # d
+    y_observed = forward_func(_m_true) + rng.standard_normal(sample_size)     # d
 
     sigma = 1.0                                     # common noise standard deviation
     Cdinv = np.eye(len(y_observed))/(sigma**2)      # inverse data covariance matrix
@@ -65,8 +66,8 @@ def main(output_dir="."):
 
     nwalkers = 32
     ndim = 4
-    nsteps = 5000
-    walkers_start = np.array([0.,0.,0.,0.]) + 1e-4 * np.random.randn(nwalkers, ndim)
+    nsteps = 10000
+    walkers_start = np.array([0.,0.,0.,0.]) + 1e-4 * rng.standard_normal((nwalkers, ndim))
 
     if save_plot or show_plot:
         _x_plot = np.linspace(-3.5,2.5)
@@ -135,7 +136,7 @@ def main(output_dir="."):
 
         # corner plot after thinning by about half the autocorrelation time
         az.plot_pair(
-            az_idata.sel(draw=slice(300,None)), 
+            az_idata.sel(draw=slice(500,None)), 
             marginals=True, 
             reference_values=dict(zip([f"var_{i}" for i in range(4)], _m_true.tolist()))
         )
@@ -143,11 +144,8 @@ def main(output_dir="."):
             plt.savefig(f"{_figs_prefix}_corner")
 
         # sub-sample of 100 predicted curves from the posterior ensemble
-        flat_samples = sampler.get_chain(discard=300, thin=30, flat=True)
-        inds = np.random.randint(len(flat_samples), size=100) # get a random selection from posterior ensemble
-        _x_plot = np.linspace(-3.5,2.5)
-        _G_plot = basis_func(_x_plot)
-        _y_plot = _G_plot @ _m_true
+        flat_samples = sampler.get_chain(discard=500, thin=50, flat=True)
+        inds = rng.integers(len(flat_samples), size=100) # get a random selection from posterior ensemble
         plt.figure(figsize=(12,8))
         sample = flat_samples[0]
         _y_synth = _G_plot @ sample
@@ -169,7 +167,7 @@ def main(output_dir="."):
         
 
     if show_summary:
-        flat_samples = sampler.get_chain(discard=300, thin=30, flat=True)
+        flat_samples = sampler.get_chain(discard=500, thin=50, flat=True)
         # uncertainties - 16th, 50th, and 84th percentiles of the samples in the marginalized distributions
         solmed = np.zeros(4)
         for i in range(ndim):
@@ -28,10 +28,11 @@ parameters as the basis function.
 ############# 0. Import modules #######################################################
 
 import numpy as np
+from numpy.polynomial.polynomial import polyval
 import matplotlib.pyplot as plt
 from cofi import BaseProblem, InversionOptions, Inversion
 
-np.random.seed(42)
+rng = np.random.default_rng(42)
 
 save_plot = True
 show_plot = False
@@ -48,19 +49,19 @@ def main(output_dir="."):
 
     # generate data with random Gaussian noise
     def basis_func(x):
-        return np.array([x**i for i in range(4)]).T                           # x -> G
+        return np.vander(x, N=4, increasing=True)                             # x -> G
     _m_true = np.array([-6,-5,2,1])                                           # m
 
     sample_size = 20                                                          # N
-    x = np.random.choice(np.linspace(-3.5,2.5), size=sample_size)             # x
+    x = rng.uniform(-3.5, 2.5, size=sample_size)                              # x
+    G = basis_func(x)                                                         # G
     def forward_func(m):
-        return basis_func(x) @ m                                              # m -> y_synthetic
-    y_observed = forward_func(_m_true) + np.random.normal(0,1,sample_size)    # d
+        return m[0] + x * (m[1] + x * (m[2] + x * m[3]))                      # m -> y_synthetic
+    y_observed = forward_func(_m_true) + rng.standard_normal(sample_size)     # d
 
     if save_plot or show_plot:
         _x_plot = np.linspace(-3.5,2.5)
-        _G_plot = basis_func(_x_plot)
-        _y_plot = _G_plot @ _m_true
+        _y_plot = polyval(_x_plot, _m_true)
         plt.figure(figsize=(12,8))
         plt.plot(_x_plot, _y_plot, color="darkorange", label="true model")
         plt.scatter(x, y_observed, color="lightcoral", label="observed data")
@@ -75,6 +76,7 @@ def main(output_dir="."):
     inv_problem.name = "Polynomial Regression"
     inv_problem.set_data(y_observed)
     inv_problem.set_forward(forward_func)
+    inv_problem.set_jacobian(G)
     inv_problem.set_initial_model(np.ones(4))
     if show_summary:
         inv_problem.summary()
@@ -83,6 +85,9 @@ def main(output_dir="."):
     ############# 2. Define the inversion options #####################################
     inv_options = InversionOptions()
     inv_options.set_tool("scipy.optimize.least_squares")
+    # the problem is linear with a constant Jacobian G, so Levenberg-Marquardt
+    # lands on the solution in its first step
+    inv_options.set_params(method="lm", x_scale="jac")
     if show_summary:
         inv_options.summary()
 
@@ -96,10 +101,7 @@ def main(output_dir="."):
 
     ############# 4. Plot result ######################################################
     if save_plot or show_plot:
-        _x_plot = np.linspace(-3.5,2.5)
-        _G_plot = basis_func(_x_plot)
-        _y_plot = _G_plot @ _m_true
-        _y_synth = _G_plot @ inv_result.model
+        _y_synth = polyval(_x_plot, inv_result.model)
         plt.figure(figsize=(12,8))
         plt.plot(_x_plot, _y_plot, color="darkorange", label="true model")
         plt.plot(_x_plot, _y_synth, color="seagreen", label="least-squares optimization solution")
@@ -31,7 +31,7 @@ import numpy as np
 import matplotlib.pyplot as plt
 from cofi import BaseProblem, InversionOptions, Inversion
 
-np.random.seed(42)
+rng = np.random.default_rng(42)
 
 save_plot = True
 show_plot = False
@@ -48,15 +48,15 @@ def main(output_dir="."):
 
     # generate data with random Gaussian noise
     def basis_func(x):
-        return np.array([x**i for i in range(4)]).T                           # x -> G
+        return np.vander(x, N=4, increasing=True)                             # x -> G
     _m_true = np.array([-6,-5,2,1])                                           # m
 
     sample_size = 20                                                          # N
-    x = np.random.choice(np.linspace(-3.5,2.5), size=sample_size)             # x
+    x = rng.uniform(-3.5, 2.5, size=sample_size)                              # x
     def forward_func(m):
         return basis_func(x).dot(m)
         return np.array(list(np.sum([basis_func(x)[j,i] * m[i] for i in range(4)]) for j in range(sample_size)))            # m -> y_synthetic
-    y_observed = forward_func(_m_true) + np.random.normal(0,1,sample_size)    # d
+    y_observed = forward_func(_m_true) + rng.standard_normal(sample_size)     # d
 
     def obj_func(m):
         return np.sum(np.square(forward_func(m) - y_observed))
@@ -103,9 +103,6 @@ def main(output_dir="."):
 
     ############# 4. Plot result ######################################################
     if save_plot or show_plot:
-        _x_plot = np.linspace(-3.5,2.5)
-        _G_plot = basis_func(_x_plot)
-        _y_plot = _G_plot @ _m_true
         _y_synth = _G_plot @ inv_result.model
         plt.figure(figsize=(12,8))
         plt.plot(_x_plot, _y_plot, color="darkorange", label="true model")
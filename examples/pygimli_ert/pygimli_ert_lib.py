@@ -6,6 +6,7 @@ forward problem name, to align well with the naming of Jupyter notebook.
 """
 
 import numpy as np
+from scipy.linalg.blas import dsyrk
 
 import pygimli
 from pygimli import meshtools
@@ -38,7 +39,7 @@ def ert_simulate(mesh, scheme, rhomap, noise_level=1, noise_abs=1e-6):
     log_data = np.log(data["rhoa"].array())
     data_err = data["rhoa"] * data["err"]
     data_err_log = np.log(data_err)
-    data_cov_inv = np.eye(log_data.shape[0]) / (data_err_log ** 2)
+    data_cov_inv = 1 / np.array(data_err_log) ** 2      # diagonal of inverse data covariance
     return data, log_data, data_cov_inv
 
 # PyGIMLi ert.ERTManager
@@ -86,16 +87,16 @@ def reg_matrix(forward_oprt):
     region_manager.setConstraintType(2)
     Wm = pygimli.matrix.SparseMapMatrix()
     region_manager.fillConstraints(Wm)
-    Wm = pygimli.utils.sparseMatrix2coo(Wm)
+    Wm = pygimli.utils.sparseMatrix2coo(Wm).tocsr()
     return Wm
 
 # initialise model
 def starting_model(ert_manager, val=None):
     data = ert_manager.data
     start_val = val if val else np.median(data['rhoa'].array())     # this is how pygimli initialises
-    start_model = np.ones(ert_manager.paraDomain.cellCount()) * start_val
+    start_model = np.full(ert_manager.paraDomain.cellCount(), start_val)
     start_val_log = np.log(start_val)
-    start_model_log = np.ones(ert_manager.paraDomain.cellCount()) * start_val_log
+    start_model_log = np.full(ert_manager.paraDomain.cellCount(), start_val_log)
     return start_model, start_model_log
 
 # convert model to numpy array
@@ -113,9 +114,76 @@ def _ensure_numpy(model):
         model = model.cpu().detach().numpy()
     return model
 
+def _scale_jacobian(J, response, model_exp):
+    # d(log data)/d(log model) = J * model / data, written into a single new buffer
+    jac = np.multiply(J, np.exp(-response)[:, np.newaxis])
+    jac *= model_exp[np.newaxis, :]
+    return jac
+
+class Memoize:
+    """Remember the response and Jacobian of the last model evaluated
+
+    The gradient, Hessian and objective of an inversion are usually requested for the
+    same model one after another, so caching the forward solve and the Jacobian
+    assembly here saves repeating the most expensive parts of each iteration.
+    """
+    def __init__(self):
+        self._key = None
+        self._model_exp = None
+        self._response = None
+        self._jacobian = None
+
+    def _update_key(self, model, forward_operator):
+        key = (id(forward_operator), model.tobytes())
+        if key != self._key:
+            self._key = key
+            self._model_exp = np.exp(model)
+            self._response = None
+            self._jacobian = None
+
+    def response(self, model, forward_operator):
+        self._update_key(model, forward_operator)
+        if self._response is None:
+            self._response = np.log(np.asarray(forward_operator.response(self._model_exp)))
+        return self._response
+
+    def jacobian(self, model, forward_operator):
+        response = self.response(model, forward_operator)
+        if self._jacobian is None:
+            forward_operator.createJacobian(self._model_exp)
+            J = np.asarray(forward_operator.jacobian())
+            self._jacobian = _scale_jacobian(J, response, self._model_exp)
+        return self._jacobian
+
+_memo = Memoize()
+
+def _check_data_cov_inv(data_cov_inv):
+    # the data covariance is assumed diagonal, so only its inverse diagonal is accepted
+    if data_cov_inv is None:
+        return None
+    data_cov_inv = np.asarray(data_cov_inv)
+    if data_cov_inv.ndim != 1:
+        raise ValueError(
+            "data_cov_inv should be the 1D diagonal of the inverse data covariance, "
+            f"but got an array of shape {data_cov_inv.shape}; pass np.diag(matrix) instead"
+        )
+    return data_cov_inv
+
+_reg_triplet_cache = {"WtW": None, "triplet": None}
+
+def _reg_triplet(WtW):
+    # (row, col, data) of W^T W, computed once per matrix; duplicates are summed so that
+    # the fancy-indexed += in get_hessian never drops repeated entries
+    if _reg_triplet_cache["WtW"] is not WtW:
+        reg = WtW.tocoo()
+        reg.sum_duplicates()
+        _reg_triplet_cache["WtW"] = WtW
+        _reg_triplet_cache["triplet"] = (reg.row, reg.col, reg.data)
+    return _reg_triplet_cache["triplet"]
+
 def get_response(model, forward_operator):
     model = _ensure_numpy(model)
-    return np.log(np.array(forward_operator.response(np.exp(model))))
+    return _memo.response(model, forward_operator)
 
 def get_residual(model, log_data, forward_operator):
     response = get_response(model, forward_operator)
@@ -123,47 +191,56 @@ def get_residual(model, log_data, forward_operator):
     return residual
 
 def get_jacobian(model, forward_operator):
-    response = get_response(model, forward_operator)
     model = _ensure_numpy(model)
-    forward_operator.createJacobian(np.exp(model))
-    J = np.array(forward_operator.jacobian())
-    jac = J / np.exp(response[:, np.newaxis]) * np.exp(model)[np.newaxis, :]
-    return jac
+    return _memo.jacobian(model, forward_operator)
 
 def get_jac_residual(model, log_data, forward_operator):
-    response = get_response(model, forward_operator)
-    residual = log_data - response
-    model = _ensure_numpy(model)
-    forward_operator.createJacobian(np.exp(model))
-    J = np.array(forward_operator.jacobian())
-    jac = J / np.exp(response[:, np.newaxis]) * np.exp(model)[np.newaxis, :]
+    residual = get_residual(model, log_data, forward_operator)
+    jac = get_jacobian(model, forward_operator)
     return jac, residual
 
 def get_data_misfit(model, log_data, forward_operator, data_cov_inv=None):
+    data_cov_inv = _check_data_cov_inv(data_cov_inv)
     residual = get_residual(model, log_data, forward_operator)
-    data_cov_inv = np.eye(log_data.shape[0]) if data_cov_inv is None else data_cov_inv
-    return np.abs(residual.T @ data_cov_inv @ residual)
+    weighted_residual = residual if data_cov_inv is None else residual * data_cov_inv
+    return weighted_residual @ residual
 
-def get_regularization(model, Wm, lamda):
+def get_regularization(model, WtW, lamda):
+    # regularise the log model, consistent with the log parameterisation of the inversion
     model = _ensure_numpy(model)
-    model = np.exp(model)
-    return lamda * (Wm @ model).T @ (Wm @ model)
+    return lamda * model @ (WtW @ model)
 
-def get_objective(model, log_data, forward_operator, Wm, lamda, data_cov_inv=None):
+def get_objective(model, log_data, forward_operator, WtW, lamda, data_cov_inv=None):
     data_misfit = get_data_misfit(model, log_data, forward_operator, data_cov_inv)
-    regularization = get_regularization(model, Wm, lamda)
+    regularization = get_regularization(model, WtW, lamda)
     obj = data_misfit + regularization
     return obj
 
-def get_gradient(model, log_data, forward_operator, Wm, lamda, data_cov_inv=None):
+def get_gradient(model, log_data, forward_operator, WtW, lamda, data_cov_inv=None):
+    data_cov_inv = _check_data_cov_inv(data_cov_inv)
     jac, residual = get_jac_residual(model, log_data, forward_operator)
-    data_cov_inv = np.eye(log_data.shape[0]) if data_cov_inv is None else data_cov_inv
-    data_misfit_grad =  - residual.T @ data_cov_inv @ jac
-    regularization_grad = lamda * Wm.T @ Wm @ np.exp(model)
+    weighted_residual = residual if data_cov_inv is None else residual * data_cov_inv
+    data_misfit_grad =  - weighted_residual @ jac
+    regularization_grad = lamda * WtW @ model
     return data_misfit_grad + regularization_grad
 
-def get_hessian(model, log_data, forward_operator, Wm, lamda, data_cov_inv=None):
+def get_hessian(model, log_data, forward_operator, WtW, lamda, data_cov_inv=None):
+    data_cov_inv = _check_data_cov_inv(data_cov_inv)
     jac = get_jacobian(model, forward_operator)
-    data_cov_inv = np.eye(log_data.shape[0]) if data_cov_inv is None else data_cov_inv
-    hess = jac.T @ data_cov_inv @ jac + lamda * Wm.T @ Wm
+    weighted_jac = jac if data_cov_inv is None else jac * np.sqrt(data_cov_inv)[:, np.newaxis]
+    # J^T C_d^-1 J is symmetric, so let BLAS compute the lower triangle only (half the
+    # flops of a full matmul) and mirror it; weighted_jac.T is F-ordered, so no copy
+    hess = dsyrk(1.0, weighted_jac.T, lower=1)
+    hess += np.tril(hess, -1).T
+    rows, cols, data = _reg_triplet(WtW)
+    hess[rows, cols] += lamda * data
     return hess
+
+def get_hessian_times_vector(model, vector, log_data, forward_operator, WtW, lamda, data_cov_inv=None):
+    # J^T C_d^-1 (J v) + lamda W^T W v, without forming the dense Hessian
+    data_cov_inv = _check_data_cov_inv(data_cov_inv)
+    jac = get_jacobian(model, forward_operator)
+    jac_vector = jac @ vector
+    if data_cov_inv is not None:
+        jac_vector *= data_cov_inv
+    return jac.T @ jac_vector + lamda * (WtW @ vector)
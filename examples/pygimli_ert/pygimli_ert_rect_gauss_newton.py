@@ -57,6 +57,7 @@ forward_oprt = ert_forward_operator(ert_manager, scheme, inv_mesh)
 
 # extract regularization matrix
 Wm = reg_matrix(forward_oprt)
+WtW = (Wm.T @ Wm).tocsr()
 
 # initialise a starting model for inversion
 start_model, start_model_log = starting_model(ert_manager)
@@ -68,7 +69,7 @@ ax[0].figure.savefig("figs/rect_mesh/rect_gauss_newton_rect_model_start")
 ############# Inverted by our Gauss-Newton algorithm ##################################
 
 # hyperparameters
-lamda = 0.0001
+lamda = 4
 niter = 10          # more iterations are needed, try with a different number
 inv_verbose = True
 step = 0.01
@@ -80,9 +81,9 @@ ert_problem.set_forward(get_response, args=[forward_oprt])
 ert_problem.set_jacobian(get_jacobian, args=[forward_oprt])
 ert_problem.set_residual(get_residual, args=[log_data, forward_oprt])
 ert_problem.set_data_misfit(get_data_misfit, args=[log_data, forward_oprt])
-ert_problem.set_regularization(get_regularization, args=[Wm, lamda])
-ert_problem.set_gradient(get_gradient, args=[log_data, forward_oprt, Wm, lamda])
-ert_problem.set_hessian(get_hessian, args=[log_data, forward_oprt, Wm, lamda])
+ert_problem.set_regularization(get_regularization, args=[WtW, lamda])
+ert_problem.set_gradient(get_gradient, args=[log_data, forward_oprt, WtW, lamda])
+ert_problem.set_hessian(get_hessian, args=[log_data, forward_oprt, WtW, lamda])
 ert_problem.set_initial_model(start_model_log)
 
 # CoFI - define InversionOptions
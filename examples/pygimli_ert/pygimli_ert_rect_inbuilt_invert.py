@@ -48,8 +48,9 @@ inv = mgr.invert(lam=20, verbose=True)
 # fig.savefig("figs/rect_mesh/rect_inbuilt_solver_result")
 
 Wm = reg_matrix(mgr.fop)
+WtW = (Wm.T @ Wm).tocsr()
 print("data misfit:", get_data_misfit(np.log(inv), log_data, mgr.fop, data_cov_inv))
-print("regularization:", get_regularization(np.log(inv), Wm, 0.0005))
+print("regularization:", get_regularization(np.log(inv), WtW, 20))
 
 # plot inferred model
 ax = pygimli.show(mgr.paraDomain, data=inv, label=r"$\Omega m$")
@@ -55,6 +55,7 @@ forward_oprt = ert_forward_operator(ert_manager, scheme, inv_mesh)
 
 # extract regularization matrix
 Wm = reg_matrix(forward_oprt)
+WtW = (Wm.T @ Wm).tocsr()
 
 # initialise a starting model for inversion
 start_model, start_model_log = starting_model(ert_manager)
@@ -66,7 +67,7 @@ ax[0].figure.savefig("figs/emcee_toy_model_start")
 ############# Define CoFI BaseProblem #################################################
 
 # hyperparameters
-lamda = 0.0005
+lamda = 20
 
 # CoFI - define BaseProblem
 ert_problem = BaseProblem()
@@ -75,9 +76,9 @@ ert_problem.set_forward(get_response, args=[forward_oprt])
 ert_problem.set_jacobian(get_jacobian, args=[forward_oprt])
 ert_problem.set_residual(get_residual, args=[log_data, forward_oprt])
 ert_problem.set_data_misfit(get_data_misfit, args=[log_data, forward_oprt, data_cov_inv])
-ert_problem.set_regularization(get_regularization, args=[Wm, lamda])
-ert_problem.set_gradient(get_gradient, args=[log_data, forward_oprt, Wm, lamda, data_cov_inv])
-ert_problem.set_hessian(get_hessian, args=[log_data, forward_oprt, Wm, lamda, data_cov_inv])
+ert_problem.set_regularization(get_regularization, args=[WtW, lamda])
+ert_problem.set_gradient(get_gradient, args=[log_data, forward_oprt, WtW, lamda, data_cov_inv])
+ert_problem.set_hessian(get_hessian, args=[log_data, forward_oprt, WtW, lamda, data_cov_inv])
 ert_problem.set_initial_model(start_model_log)
 
 
@@ -92,8 +93,8 @@ def log_likelihood(model):
     return -0.5 * ert_problem.data_misfit(model)
 
 # for emcee - define log_prior
-m_lower_bound = np.ones(start_model.shape) * 3    # lower bound for uniform prior
-m_upper_bound = np.ones(start_model.shape) * 6    # upper bound for uniform prior
+m_lower_bound = np.full(start_model.shape, 3.0)   # lower bound for uniform prior
+m_upper_bound = np.full(start_model.shape, 6.0)   # upper bound for uniform prior
 def log_prior(model):                           # uniform distribution
     for i in range(len(m_lower_bound)):
         if model[i] < m_lower_bound[i] or model[i] > m_upper_bound[i]: return -np.inf
@@ -1,5 +1,8 @@
 import os
+import warnings
 import numpy as np
+from scipy.linalg import cho_factor, cho_solve
+from scipy.sparse.linalg import LinearOperator, cg
 import pygimli
 from pygimli.physics import ert
 from cofi import BaseProblem, InversionOptions, Inversion
@@ -21,6 +24,7 @@ from pygimli_ert_lib import (
     get_regularization,
     get_gradient,
     get_hessian,
+    get_hessian_times_vector,
 )
 
 if not os.path.exists("figs/tri_mesh"): os.makedirs("figs/tri_mesh")
@@ -57,6 +61,7 @@ forward_oprt = ert_forward_operator(ert_manager, scheme, inv_mesh)
 
 # extract regularization matrix
 Wm = reg_matrix(forward_oprt)
+WtW = (Wm.T @ Wm).tocsr()
 
 # initialise a starting model for inversion
 start_model, start_model_log = starting_model(ert_manager)
@@ -76,17 +81,20 @@ class GaussNewton(BaseInferenceTool):
     required_in_problem = {"initial_model", "residual", "jacobian", "gradient"}
     optional_in_problem = dict()
     required_in_options = set()
-    optional_in_options = {"niter": 100, "verbose": True, "tau_tol": 1e-5, "update_tol": 1e-5}
+    optional_in_options = {"niter": 100, "verbose": True, "tau_tol": 1e-5, "update_tol": 1e-5, "step": 1, "linear_solver": "cholesky", "cg_maxiter": None}
     def __init__(self, inv_problem, inv_options):
         __params = inv_options.get_params()
         self._niter = __params.get("niter", 100)
         self._verbose = __params.get("verbose", True)
         self._step = __params.get("step", 1)
+        self._linear_solver = __params.get("linear_solver", "cholesky")
+        self._cg_maxiter = __params.get("cg_maxiter", None)
         self._model_0 = inv_problem.initial_model
         self._residual = inv_problem.residual
         self._jacobian = inv_problem.jacobian
         self._gradient = inv_problem.gradient
         self._hessian = inv_problem.hessian
+        self._hessp = inv_problem.hessian_times_vector if inv_problem.hessian_times_vector_defined else None
         self._misfit = inv_problem.data_misfit if inv_problem.data_misfit_defined else None
         self._reg = inv_problem.regularization if inv_problem.regularization_defined else None
         self._obj = inv_problem.objective if inv_problem.objective_defined else None
@@ -100,17 +108,32 @@ class GaussNewton(BaseInferenceTool):
                 print("model min and max:", np.min(current_model), np.max(current_model))
                 if self._misfit: print("data misfit:", self._misfit(current_model))
                 if self._reg: print("regularization:", self._reg(current_model))
-            term1 = self._hessian(current_model)
             term2 = - self._gradient(current_model)
-            model_update = np.linalg.solve(term1, term2) * self._step
-            current_model = current_model + model_update
+            model_update = None
+            if self._linear_solver == "cg" and self._hessp is not None:
+                # matrix-free: each CG iteration only needs J v, J^T u and W^T W v
+                n = current_model.size
+                term1 = LinearOperator((n, n), matvec=lambda v: self._hessp(current_model, v))
+                model_update, info = cg(term1, term2, maxiter=self._cg_maxiter)
+                if info != 0:
+                    warnings.warn(f"CG did not converge in iteration {i+1} (info={info}), "
+                                  "falling back to a direct solve")
+                    model_update = None
+            if model_update is None:
+                term1 = self._hessian(current_model)
+                # J^T C_d^-1 J + lamda W^T W is symmetric positive definite -> Cholesky
+                term1_factor = cho_factor(term1, lower=True, overwrite_a=True, check_finite=False)
+                model_update = cho_solve(term1_factor, term2, check_finite=False)
+            current_model = current_model + model_update * self._step
         return {"model": current_model, "success": True}
 
 # hyperparameters
-lamda = 0.0005
+lamda = 20
 niter = 10          # more iterations are needed, try with a bigger value
 inv_verbose = True
 step = 0.01
+linear_solver = "cholesky"  # "cholesky" (dense Hessian) or "cg" (matrix-free, falls back to cholesky if it stalls)
+cg_maxiter = 200
 
 # CoFI - define BaseProblem
 ert_problem = BaseProblem()
@@ -119,15 +142,16 @@ ert_problem.set_forward(get_response, args=[forward_oprt])
 ert_problem.set_jacobian(get_jacobian, args=[forward_oprt])
 ert_problem.set_residual(get_residual, args=[log_data, forward_oprt])
 ert_problem.set_data_misfit(get_data_misfit, args=[log_data, forward_oprt, data_cov_inv])
-ert_problem.set_regularization(get_regularization, args=[Wm, lamda])
-ert_problem.set_gradient(get_gradient, args=[log_data, forward_oprt, Wm, lamda, data_cov_inv])
-ert_problem.set_hessian(get_hessian, args=[log_data, forward_oprt, Wm, lamda, data_cov_inv])
+ert_problem.set_regularization(get_regularization, args=[WtW, lamda])
+ert_problem.set_gradient(get_gradient, args=[log_data, forward_oprt, WtW, lamda, data_cov_inv])
+ert_problem.set_hessian(get_hessian, args=[log_data, forward_oprt, WtW, lamda, data_cov_inv])
+ert_problem.set_hessian_times_vector(get_hessian_times_vector, args=[log_data, forward_oprt, WtW, lamda, data_cov_inv])
 ert_problem.set_initial_model(start_model_log)
 
 # CoFI - define InversionOptions
 inv_options = InversionOptions()
-inv_options.set_tool("cofi.simple_newton")
-inv_options.set_params(num_iterations=niter, verbose=inv_verbose, step_length=step)
+inv_options.set_tool(GaussNewton)
+inv_options.set_params(niter=niter, verbose=inv_verbose, step=step, linear_solver=linear_solver, cg_maxiter=cg_maxiter)
 
 # CoFI - define Inversion, run it
 inv = Inversion(ert_problem, inv_options)
@@ -56,6 +56,7 @@ forward_oprt = ert_forward_operator(ert_manager, scheme, inv_mesh)
 
 # extract regularization matrix
 Wm = reg_matrix(forward_oprt)
+WtW = (Wm.T @ Wm).tocsr()
 
 # initialise a starting model for inversion
 start_model, start_model_log = starting_model(ert_manager)
@@ -67,7 +68,7 @@ ax[0].figure.savefig("figs/tri_mesh/tri_scipy_opt_model_start")
 ############# Inverted by SciPy optimizer through CoFI ################################
 
 # hyperparameters
-lamda = 0.0005
+lamda = 20
 
 # CoFI - define BaseProblem
 ert_problem = BaseProblem()
@@ -76,9 +77,9 @@ ert_problem.set_forward(get_response, args=[forward_oprt])
 ert_problem.set_jacobian(get_jacobian, args=[forward_oprt])
 ert_problem.set_residual(get_residual, args=[log_data, forward_oprt])
 ert_problem.set_data_misfit(get_data_misfit, args=[log_data, forward_oprt, data_cov_inv])
-ert_problem.set_regularization(get_regularization, args=[Wm, lamda])
-ert_problem.set_gradient(get_gradient, args=[log_data, forward_oprt, Wm, lamda, data_cov_inv])
-ert_problem.set_hessian(get_hessian, args=[log_data, forward_oprt, Wm, lamda, data_cov_inv])
+ert_problem.set_regularization(get_regularization, args=[WtW, lamda])
+ert_problem.set_gradient(get_gradient, args=[log_data, forward_oprt, WtW, lamda, data_cov_inv])
+ert_problem.set_hessian(get_hessian, args=[log_data, forward_oprt, WtW, lamda, data_cov_inv])
 ert_problem.set_initial_model(start_model_log)
 
 # CoFI - define InversionOptions